@@ -1,8 +1,9 @@
 # backend.py - Flask Backend for YouTube Downloader with Progress Streaming
-# Run with: python backend.py
+# Run with: python backend.py (production: see Procfile, gunicorn with gthread workers)
 
 from flask import Flask, request, jsonify, Response, send_file
 from flask_cors import CORS
+from cachetools import TTLCache
 import yt_dlp
 import re
 import os
@@ -10,19 +11,95 @@ import json
 import time
 import uuid
 import threading
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
+# Number of trusted proxies in front of the app (e.g. 1 behind the Heroku router);
+# only then is X-Forwarded-For used for the client address the rate limiter keys on
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
 CORS(app)
+# Let nginx/Apache stream files (X-Sendfile) when running behind one
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
 
-# Store for tracking download progress
-downloads = {}
+# Store for tracking download progress: download_id -> Download, split into 16
+# shards with their own lock so concurrent downloads don't contend on one dict
+_shards = [({}, threading.Lock()) for _ in range(16)]
 DOWNLOAD_DIR = Path("downloads")
 DOWNLOAD_DIR.mkdir(exist_ok=True)
+# Downloads run on a fixed pool instead of one thread each; extra requests queue up
+MAX_CONCURRENT_DOWNLOADS = int(os.environ.get('MAX_CONCURRENT_DOWNLOADS', 4))
+download_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS, thread_name_prefix='download')
+# Metadata extraction is CPU-heavy, so /api/fetch runs it in worker processes
+# to keep it off the GIL shared with the request and download threads
+EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+EXTRACT_TIMEOUT = 30
+# /api/fetch responses by video ID; _meta_inflight holds a Future per ID being
+# extracted so concurrent requests for the same video share one extraction
+_meta_cache = TTLCache(maxsize=1024, ttl=300)
+_meta_inflight = {}
+_meta_lock = threading.Lock()
+# Minimum gap in seconds between two yt-dlp 'downloading' callbacks that are acted on
+PROGRESS_INTERVAL = 0.2
+# Seconds an idle SSE stream waits before sending a keepalive comment
+SSE_KEEPALIVE = 15
+# Finished downloads that are never fetched are dropped after this many seconds
+DOWNLOAD_TTL = int(os.environ.get('DOWNLOAD_TTL', 1800))
+# Grace period before a served file is deleted, so in-flight and resumed transfers finish
+SERVED_FILE_TTL = 60
+
+# Timed cleanup jobs as a min-heap of (due, seq, func, args); cleanup_loop sleeps
+# on the condition until the earliest one is due, so it never wakes when idle
+_ttl_heap = []
+_ttl_cv = threading.Condition()
+_ttl_seq = itertools.count()
+
+# Approximate sliding-window limit per IP on the endpoints that start yt-dlp work;
+# each IP maps to [window_index, prev_window_count, cur_window_count]
+# Off unless RATE_LIMIT is set; behind a router also set TRUSTED_PROXIES, or every
+# client shares the router's address and therefore one limit
+RATE_LIMIT = int(os.environ.get('RATE_LIMIT', 0))
+RATE_WINDOW = 60
+rate_limits = {}
+# Sharded so concurrent hits from one IP can't both slip past the check,
+# without serialising every IP behind a single lock
+_rate_locks = [threading.Lock() for _ in range(64)]
+_rate_sweep_lock = threading.Lock()
+_rate_sweep_scheduled = False
+
+_YT_RE = re.compile(
+    r'^(?:https?://)?(?:www\.)?(?:youtube\.com/(?:watch\?v=|embed/|v/|shorts/)|youtu\.be/)([A-Za-z0-9_-]{11})',
+    re.ASCII
+)
+_YT_FAST_PREFIXES = ("https://www.youtube.com/watch?v=", "https://youtu.be/")
+_YT_ID_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-")
+
+def extract_video_id(url):
+    """Return the 11-char video ID of a YouTube URL, or None if it isn't one"""
+    # Fast path for the two forms the frontend sends; same result as the regex
+    for prefix in _YT_FAST_PREFIXES:
+        if url.startswith(prefix):
+            video_id = url[len(prefix):len(prefix) + 11]
+            if len(video_id) == 11 and _YT_ID_CHARS.issuperset(video_id):
+                return video_id
+            return None
+    match = _YT_RE.match(url)
+    return match.group(1) if match else None
 
 def validate_youtube_url(url):
-    youtube_regex = r'^(https?://)?(www.)?(youtube.com/(watch?v=|embed/|v/|shorts/)|youtu.be/)[a-zA-Z0-9_-]{11}'
-    return bool(re.match(youtube_regex, url))
+    return extract_video_id(url) is not None
 
 def format_duration(seconds):
     if not seconds:
@@ -42,78 +119,329 @@ def format_views(views):
         return f"{views / 1_000:.1f}K views"
     return f"{views} views"
 
+def schedule(delay, func, *args):
+    """Run func(*args) on the cleanup thread after delay seconds"""
+    job = (time.monotonic() + delay, next(_ttl_seq), func, args)
+    with _ttl_cv:
+        heapq.heappush(_ttl_heap, job)
+        # Only an earlier deadline changes how long cleanup_loop should sleep
+        if _ttl_heap[0] is job:
+            _ttl_cv.notify()
+
+def cleanup_loop():
+    while True:
+        with _ttl_cv:
+            while not _ttl_heap or _ttl_heap[0][0] > time.monotonic():
+                _ttl_cv.wait(_ttl_heap[0][0] - time.monotonic() if _ttl_heap else None)
+            _, _, func, args = heapq.heappop(_ttl_heap)
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"Cleanup job {func.__name__} failed: {e}")
+
+threading.Thread(target=cleanup_loop, daemon=True).start()
+
+def schedule_delete(path, delay=SERVED_FILE_TTL):
+    schedule(delay, delete_file, path)
+
+def delete_file(path):
+    Path(path).unlink(missing_ok=True)
+
+def _rate_lock(ip):
+    return _rate_locks[hash(ip) & 63]
+
+def rate_limited(ip):
+    """Record a hit for ip and return True if it is over RATE_LIMIT in the last RATE_WINDOW"""
+    if RATE_LIMIT <= 0:
+        return False
+    with _rate_lock(ip):
+        now = time.monotonic()
+        window, offset = divmod(now, RATE_WINDOW)
+        entry = rate_limits.get(ip)
+        if entry is None:
+            entry = rate_limits[ip] = [window, 0, 0]
+            _schedule_rate_sweep()
+        elif entry[0] != window:
+            # Shift current -> previous; a gap of more than one window empties both
+            entry[1] = entry[2] if entry[0] == window - 1 else 0
+            entry[2] = 0
+            entry[0] = window
+        # Count the previous window's hits in proportion to how much of it still overlaps
+        if entry[1] * (1 - offset / RATE_WINDOW) + entry[2] >= RATE_LIMIT:
+            return True
+        entry[2] += 1
+        return False
+
+def _schedule_rate_sweep():
+    global _rate_sweep_scheduled
+    with _rate_sweep_lock:
+        if not _rate_sweep_scheduled:
+            _rate_sweep_scheduled = True
+            schedule(RATE_WINDOW, sweep_rate_limits)
+
+def sweep_rate_limits():
+    """Drop rate limit entries for IPs that have gone quiet"""
+    global _rate_sweep_scheduled
+    # Entries older than the previous window no longer contribute to any count
+    stale = time.monotonic() // RATE_WINDOW - 1
+    for ip, entry in list(rate_limits.items()):
+        if entry[0] < stale:
+            with _rate_lock(ip):
+                # Re-check under the lock in case a hit just refreshed it
+                if entry[0] < stale:
+                    rate_limits.pop(ip, None)
+    # Keep sweeping only while there is something left to expire
+    with _rate_sweep_lock:
+        if rate_limits:
+            schedule(RATE_WINDOW, sweep_rate_limits)
+        else:
+            _rate_sweep_scheduled = False
+
+def _init_ydl():
+    """Pool initializer: build one YoutubeDL per worker process and reuse it"""
+    global _ydl
+    _ydl = yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True, 'extract_flat': False})
+
+def _extract(url):
+    """Runs in an extract_pool process; returns the /api/fetch response body"""
+    try:
+        info = _ydl.extract_info(url, download=False)
+    except Exception as e:
+        # yt-dlp errors hold unpicklable state; only the message goes back to the parent
+        raise RuntimeError(str(e)) from None
+
+    # First format seen for each height; only the top 4 heights get formatted
+    by_height = {}
+    for f in info.get('formats', ()):
+        height = f.get('height')
+        if height and height >= 360 and height not in by_height:
+            by_height[height] = f
+
+    formats = []
+    for height in sorted(by_height, reverse=True)[:4]:
+        f = by_height[height]
+        filesize = f.get('filesize') or f.get('filesize_approx')
+        size_str = f"{filesize / (1024*1024):.1f} MB" if filesize else "Unknown"
+        formats.append({
+            'quality': f"{height}p",
+            'format': f.get('ext', 'mp4'),
+            'size': size_str
+        })
+
+    return {
+        'title': info.get('title', 'Unknown'),
+        'thumbnail': info.get('thumbnail', ''),
+        'duration': format_duration(info.get('duration')),
+        'views': format_views(info.get('view_count')),
+        'channel': info.get('uploader', 'Unknown'),
+        'formats': formats
+    }
+
+def new_extract_pool():
+    pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, initializer=_init_ydl)
+    # Workers start on the first submit; do it now with a no-op so each one has
+    # built its YoutubeDL before the first /api/fetch arrives
+    pool.submit(os.getpid)
+    return pool
+
+extract_pool = new_extract_pool()
+_extract_pool_lock = threading.Lock()
+
+def extract_video_info(url):
+    global extract_pool
+    pool = extract_pool
+    try:
+        return pool.submit(_extract, url).result(timeout=EXTRACT_TIMEOUT)
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; start a fresh one for later requests.
+        # Only the first caller to see this broken pool replaces it
+        with _extract_pool_lock:
+            if extract_pool is pool:
+                extract_pool = new_extract_pool()
+                pool.shutdown(wait=False)
+        raise
+
+def cached_video_info(video_id):
+    """extract_video_info for a video ID, served from _meta_cache when fresh"""
+    with _meta_lock:
+        info = _meta_cache.get(video_id)
+        if info is not None:
+            return info
+        pending = _meta_inflight.get(video_id)
+        leader = pending is None
+        if leader:
+            pending = _meta_inflight[video_id] = Future()
+
+    if not leader:
+        return pending.result(timeout=EXTRACT_TIMEOUT)
+
+    try:
+        # Canonical URL so the extraction matches the cache key, whatever form was sent
+        info = extract_video_info(f"https://www.youtube.com/watch?v={video_id}")
+    except Exception as e:
+        with _meta_lock:
+            _meta_inflight.pop(video_id, None)
+        pending.set_exception(e)
+        raise
+
+    with _meta_lock:
+        _meta_cache[video_id] = info
+        _meta_inflight.pop(video_id, None)
+    pending.set_result(info)
+    return info
+
 @app.route('/api/fetch', methods=['POST'])
 def fetch_video():
     try:
+        if rate_limited(request.remote_addr):
+            return jsonify({'error': 'Too many requests'}), 429
+
         data = request.get_json()
         url = data.get('url', '')
 
-        if not url or not validate_youtube_url(url):
+        video_id = extract_video_id(url) if url else None
+        if not video_id:
             return jsonify({'error': 'Invalid YouTube URL'}), 400
 
-        ydl_opts = {'quiet': True, 'no_warnings': True, 'extract_flat': False}
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-
-            formats = []
-            seen_qualities = set()
-            for f in info.get('formats', []):
-                height = f.get('height')
-                if height and height >= 360:
-                    quality = f"{height}p"
-                    if quality not in seen_qualities:
-                        seen_qualities.add(quality)
-                        filesize = f.get('filesize') or f.get('filesize_approx')
-                        size_str = f"{filesize / (1024*1024):.1f} MB" if filesize else "Unknown"
-                        formats.append({
-                            'quality': quality,
-                            'format': f.get('ext', 'mp4'),
-                            'size': size_str
-                        })
-
-            formats.sort(key=lambda x: int(x['quality'].replace('p', '')), reverse=True)
-
-            return jsonify({
-                'title': info.get('title', 'Unknown'),
-                'thumbnail': info.get('thumbnail', ''),
-                'duration': format_duration(info.get('duration')),
-                'views': format_views(info.get('view_count')),
-                'channel': info.get('uploader', 'Unknown'),
-                'formats': formats[:4]
-            })
+        return jsonify(cached_video_info(video_id))
 
+    except TimeoutError:
+        return jsonify({'error': 'Timed out fetching video info'}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def download_worker(download_id, url, quality):
-    downloads[download_id] = {
-        'status': 'downloading',
-        'progress': 0,
-        'stage': 'downloading'
-    }
-
+def sse_frame(payload):
+    """Encode payload as SSE wire bytes; built once per state change and shared by all streams"""
+    if orjson is not None:
+        return b"data: " + orjson.dumps(payload) + b"\n\n"
+    return f"data: {json.dumps(payload)}\n\n".encode()
+
+def progress_frame(progress, stage):
+    return sse_frame({'type':'progress','progress':progress,'stage':stage})
+
+@dataclass
+class Download:
+    """State of one download; evt is set whenever it changes"""
+    status: str = 'downloading'
+    progress: int = 0
+    stage: str = 'downloading'
+    filename: str = None
+    error: str = None
+    wire: bytes = field(default_factory=lambda: progress_frame(0, 'downloading'))
+    evt: threading.Event = field(default_factory=threading.Event)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def update(self, wire, **changes):
+        """Apply changes together with the SSE frame describing them and wake the streams"""
+        with self.lock:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self.wire = wire
+        self.evt.set()
+
+    def snapshot(self):
+        with self.lock:
+            return self.status, self.wire
+
+    def to_json(self):
+        with self.lock:
+            data = {'status': self.status, 'progress': self.progress}
+            if self.status == 'error':
+                # Error entries carry the message instead of the stage they failed in
+                data['error'] = self.error
+            else:
+                data['stage'] = self.stage
+            if self.filename:
+                data['filename'] = self.filename
+        return data
+
+def get_shard(download_id):
+    return _shards[hash(download_id) & 15]
+
+def get_download(download_id):
+    shard, lock = get_shard(download_id)
+    with lock:
+        return shard.get(download_id)
+
+def pop_download(download_id, dl):
+    """Remove download_id, but only if it still refers to dl and not a newer download"""
+    shard, lock = get_shard(download_id)
+    with lock:
+        if shard.get(download_id) is not dl:
+            return False
+        del shard[download_id]
+        return True
+
+def new_download(download_id):
+    dl = Download()
+    shard, lock = get_shard(download_id)
+    with lock:
+        shard[download_id] = dl
+    schedule(DOWNLOAD_TTL, expire_download, download_id, dl)
+    return dl
+
+def expire_download(download_id, dl):
+    """Forget a download and its file once DOWNLOAD_TTL has passed"""
+    if dl.status == 'downloading':
+        schedule(DOWNLOAD_TTL, expire_download, download_id, dl)
+        return
+    if pop_download(download_id, dl) and dl.filename:
+        (DOWNLOAD_DIR / dl.filename).unlink(missing_ok=True)
+
+class ProgressAggregator:
+    """Wraps a yt-dlp progress hook, which fires on every block read, so 'downloading'
+    calls reach it at most once per period; other statuses pass straight through"""
+
+    def __init__(self, inner, period=PROGRESS_INTERVAL):
+        self.inner = inner
+        self.period = period
+        self.last = 0.0
+
+    def __call__(self, d):
+        if d['status'] != 'downloading':
+            # Let the first callback of the next file through straight away
+            self.last = 0.0
+            self.inner(d)
+            return
+        now = time.monotonic()
+        if now - self.last >= self.period:
+            self.last = now
+            self.inner(d)
+
+def download_worker(dl, download_id, url, quality):
     height = int(quality.replace('p', ''))
     filename = f"{download_id}.mp4"
     filepath = DOWNLOAD_DIR / filename
 
     def progress_hook(d):
         if d['status'] == 'downloading':
-            total = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
-            downloaded = d.get('downloaded_bytes', 0)
-            if total > 0:
-                progress = (downloaded / total) * 100
-                downloads[download_id]['progress'] = min(progress, 99)
-                downloads[download_id]['stage'] = 'downloading'
+            # The estimate can be a float; convert before checking so 0 < total < 1 can't divide by zero
+            total = int(d.get('total_bytes') or d.get('total_bytes_estimate') or 0)
+            if total <= 0:
+                return
+            # Whole percent in integer arithmetic; most calls don't move it, so bail early
+            progress = min((d.get('downloaded_bytes') or 0) * 100 // total, 99)
+            if progress == dl.progress and dl.stage == 'downloading':
+                return
+            dl.update(progress_frame(progress, 'downloading'), progress=progress, stage='downloading')
         elif d['status'] == 'finished':
-            downloads[download_id]['progress'] = 95
-            downloads[download_id]['stage'] = 'converting'
+            dl.update(progress_frame(95, 'converting'), progress=95, stage='converting')
 
     ydl_opts = {
-        'format': f'bestvideo[height<={height}][ext=mp4]+bestaudio[ext=m4a]/best',
+        # Prefer a progressive mp4 at exactly the requested height: it needs no ffmpeg
+        # merge pass. Otherwise merge the best mp4 video with m4a audio as before
+        'format': f'best[ext=mp4][height={height}]/bestvideo[height<={height}][ext=mp4]+bestaudio[ext=m4a]/best',
         'outtmpl': str(filepath.with_suffix('.%(ext)s')),
-        'progress_hooks': [progress_hook],
+        'progress_hooks': [ProgressAggregator(progress_hook)],
         'merge_output_format': 'mp4',
+        # Start the HTTP read loop at 1 MiB blocks instead of 1 KiB; yt-dlp still
+        # adapts the size to the link speed from there
+        'buffersize': 1 << 20,
+        # Fetch HLS/DASH fragments in parallel, and plain HTTP in 10 MiB ranged requests
+        'concurrent_fragment_downloads': 8,
+        'http_chunk_size': 10_485_760,
+        'retries': 3,
+        'fragment_retries': 3,
         'quiet': True,
         'no_warnings': True,
     }
@@ -132,22 +460,27 @@ def download_worker(download_id, url, quality):
         if actual_file and actual_file.suffix != '.mp4':
             actual_file.rename(filepath)
 
-        downloads[download_id] = {
-            'status': 'ready',
-            'progress': 100,
-            'filename': filename,
-            'stage': 'complete'
-        }
+        dl.update(
+            sse_frame({'type':'complete','filename':filename}),
+            status='ready',
+            progress=100,
+            filename=filename,
+            stage='complete'
+        )
 
     except Exception as e:
-        downloads[download_id] = {
-            'status': 'error',
-            'error': str(e),
-            'progress': 0
-        }
+        dl.update(
+            sse_frame({'type':'error','message':str(e) or 'Unknown'}),
+            status='error',
+            error=str(e),
+            progress=0
+        )
 
 @app.route('/api/download/stream')
 def download_stream():
+    if rate_limited(request.remote_addr):
+        return jsonify({'error': 'Too many requests'}), 429
+
     url = request.args.get('url', '')
     quality = request.args.get('quality', '720p')
     download_id = request.args.get('id', str(uuid.uuid4()))
@@ -155,30 +488,27 @@ def download_stream():
     if not url or not validate_youtube_url(url):
         return jsonify({'error': 'Invalid YouTube URL'}), 400
 
-    thread = threading.Thread(target=download_worker, args=(download_id, url, quality))
-    thread.start()
+    dl = new_download(download_id)
+    download_pool.submit(download_worker, dl, download_id, url, quality)
 
     def generate():
+        evt = dl.evt
+        sent = None
         while True:
-            if download_id in downloads:
-                status = downloads[download_id]
-
-                if status['status'] in ['downloading', 'converting']:
-                    yield f"data: {json.dumps({'type':'progress','progress':status['progress'],'stage':status.get('stage','downloading')})}
-
-"
-                elif status['status'] == 'ready':
-                    yield f"data: {json.dumps({'type':'complete','filename':status['filename']})}
-
-"
-                    break
-                elif status['status'] == 'error':
-                    yield f"data: {json.dumps({'type':'error','message':status.get('error','Unknown')})}
-
-"
-                    break
+            # Clear before reading so an update landing mid-frame is not lost
+            evt.clear()
+            status, wire = dl.snapshot()
+            done = status in ('ready', 'error')
+            if wire is not sent:
+                yield wire
+                sent = wire
+            if done:
+                break
 
-            time.sleep(0.5)
+            # Block until the worker reports a change; on timeout send an SSE comment,
+            # which EventSource ignores but keeps proxies from closing the idle stream
+            if not evt.wait(timeout=SSE_KEEPALIVE):
+                yield b": ka\n\n"
 
     return Response(generate(), mimetype='text/event-stream', headers={
         'Cache-Control': 'no-cache', 'Connection': 'keep-alive', 'Access-Control-Allow-Origin': '*'
@@ -187,6 +517,9 @@ def download_stream():
 @app.route('/api/download', methods=['POST'])
 def start_download():
     try:
+        if rate_limited(request.remote_addr):
+            return jsonify({'error': 'Too many requests'}), 429
+
         data = request.get_json()
         url = data.get('url', '')
         quality = data.get('quality', '720p')
@@ -195,8 +528,8 @@ def start_download():
         if not url or not validate_youtube_url(url):
             return jsonify({'error': 'Invalid YouTube URL'}), 400
 
-        thread = threading.Thread(target=download_worker, args=(download_id, url, quality))
-        thread.start()
+        dl = new_download(download_id)
+        download_pool.submit(download_worker, dl, download_id, url, quality)
 
         return jsonify({'status': 'started', 'id': download_id})
     except Exception as e:
@@ -204,34 +537,36 @@ def start_download():
 
 @app.route('/api/download/status/<download_id>')
 def download_status(download_id):
-    if download_id not in downloads:
+    dl = get_download(download_id)
+    if dl is None:
         return jsonify({'status': 'not_found'}), 404
-    return jsonify(downloads[download_id])
+    return jsonify(dl.to_json())
 
 @app.route('/api/download/file/<filename>')
 def download_file(filename):
-    """Serve the downloaded file and delete it after sending"""
+    """Serve the downloaded file and delete it shortly after"""
     filepath = DOWNLOAD_DIR / filename
 
     if not filepath.exists():
         return jsonify({'error': 'File not found'}), 404
 
+    # send_file hands the open file to the server's wsgi.file_wrapper (sendfile(2)
+    # under gunicorn) or to the front proxy via X-Sendfile, and supports Range requests
     response = send_file(
         filepath,
         as_attachment=True,
         download_name=filename,
-        mimetype='video/mp4'
+        mimetype='video/mp4',
+        conditional=True
     )
 
-    # Delete after sending
-    try:
-        os.remove(filepath)
-        # Remove entry from downloads dict
-        for download_id, info in list(downloads.items()):
-            if info.get('filename') == filename:
-                downloads.pop(download_id)
-    except Exception as e:
-        print(f"Failed to delete {filename}: {e}")
+    # Deleting inline would race the transfer that has only just started
+    schedule_delete(filepath)
+    # Files are named <download_id>.mp4, so the entry can be found without a scan
+    download_id = filepath.stem
+    dl = get_download(download_id)
+    if dl is not None and dl.filename == filename:
+        pop_download(download_id, dl)
 
     return response
 